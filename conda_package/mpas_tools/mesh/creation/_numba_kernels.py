@@ -0,0 +1,119 @@
+"""
+Optional ``numba`` kernels used as fast paths by the mesh creation tools.
+This module imports ``numba`` at the top level, so it should only be imported
+through :py:func:`mpas_tools.mesh.creation.util.get_numba_kernels()`, which
+returns ``None`` if ``numba`` is not installed.
+"""
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import math
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(fastmath=True, cache=True)
+def tanh_approx(x):
+    """
+    A branch-light rational (Pade) approximation of ``tanh``, accurate to
+    about 1e-4, which saturates at +/-1 where the approximation reaches 1
+    """
+    if x >= 4.97:
+        return 1.0
+    if x <= -4.97:
+        return -1.0
+    x2 = x * x
+    return x * (135135.0 + x2 * (17325.0 + x2 * (378.0 + x2))) / \
+        (135135.0 + x2 * (62370.0 + x2 * (3150.0 + 28.0 * x2)))
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def merge_cell_width_vs_lat(lat, cellWidthInSouth, cellWidthInNorth,
+                            latTransition, latWidthTransition, fastTanh):
+    """
+    A single-pass version of ``mergeCellWidthVsLat()``, optionally using
+    ``tanh_approx()``
+    """
+    cellWidthOut = np.empty_like(lat)
+    for i in prange(lat.size):
+        if latWidthTransition == 0.:
+            if lat[i] < latTransition:
+                cellWidthOut[i] = cellWidthInSouth[i]
+            else:
+                cellWidthOut[i] = cellWidthInNorth[i]
+        else:
+            x = (lat[i] - latTransition) / latWidthTransition
+            if fastTanh:
+                weightNorth = 0.5 * (tanh_approx(x) + 1.0)
+            else:
+                weightNorth = 0.5 * (math.tanh(x) + 1.0)
+            cellWidthOut[i] = (1.0 - weightNorth) * cellWidthInSouth[i] + \
+                weightNorth * cellWidthInNorth[i]
+    return cellWidthOut
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def ec_cell_width_vs_lat(lat, minCellWidth, densityEq, densityMidLat,
+                         densityPole, latPosEq, latPosPole, latTransition,
+                         latWidthEq, latWidthPole, fastTanh):
+    """
+    A single-pass version of ``EC_CellWidthVsLat()``, taking the densities
+    already computed from the cell widths and optionally using
+    ``tanh_approx()``
+    """
+    cellWidthOut = np.empty_like(lat)
+    for i in prange(lat.size):
+        absLat = abs(lat[i])
+        if absLat < latTransition:
+            x = (latPosEq - absLat) / latWidthEq
+            high = densityEq
+            low = densityMidLat
+        else:
+            x = (latPosPole - absLat) / latWidthPole
+            high = densityMidLat
+            low = densityPole
+        if fastTanh:
+            t = tanh_approx(x)
+        else:
+            t = math.tanh(x)
+        density = ((high - low) * (1.0 + t) / 2.0) + low
+        cellWidthOut[i] = minCellWidth / math.sqrt(math.sqrt(density))
+    return cellWidthOut
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def rrs_cell_width_vs_lat(lat, cellWidthPole, gamma):
+    """
+    A single-pass version of ``RRS_CellWidthVsLat()``, taking the ratio
+    ``gamma`` already computed from the cell widths
+    """
+    cellWidthOut = np.empty_like(lat)
+    for i in prange(lat.size):
+        s = math.sin(math.radians(abs(lat[i])))
+        s2 = s * s
+        density = (1.0 - gamma) * (s2 * s2) + gamma
+        cellWidthOut[i] = cellWidthPole / math.sqrt(math.sqrt(density))
+    return cellWidthOut
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def circumcenter_planar(x1, y1, x2, y2, x3, y3):
+    """
+    A single-pass version of ``circumcenter_planar_batch()``
+    """
+    xv = np.empty(x1.size)
+    yv = np.empty(x1.size)
+    for i in prange(x1.size):
+        d = 2 * (x1[i] * (y2[i] - y3[i]) + x2[i] * (y3[i] - y1[i]) +
+                 x3[i] * (y1[i] - y2[i]))
+
+        r1 = x1[i] * x1[i] + y1[i] * y1[i]
+        r2 = x2[i] * x2[i] + y2[i] * y2[i]
+        r3 = x3[i] * x3[i] + y3[i] * y3[i]
+
+        xv[i] = (r1 * (y2[i] - y3[i]) + r2 * (y3[i] - y1[i]) +
+                 r3 * (y1[i] - y2[i])) / d
+        yv[i] = (r1 * (x3[i] - x2[i]) + r2 * (x1[i] - x3[i]) +
+                 r3 * (x2[i] - x1[i])) / d
+    return xv, yv
@@ -58,7 +58,8 @@ def jigsaw_driver(cellWidth, x, y, on_sphere=True, earth_radius=6371.0e3,
        hmat.mshID = 'EUCLIDEAN-GRID'
        hmat.xgrid = x
        hmat.ygrid = y
-    hmat.value = cellWidth
+    # jigsaw expects double-precision cell widths
+    hmat.value = numpy.asarray(cellWidth, dtype=float)
     jigsawpy.savemsh(opts.hfun_file, hmat)
 
     # define JIGSAW geometry
@@ -71,11 +71,11 @@ def jigsaw_to_netcdf(msh_filename, output_name, on_sphere, sphere_radius=None):
         'cellsOnVertex_full is not the right shape!'
 
     # Create vertex variables
-    xVertex_full = np.zeros((nVertices,))
-    yVertex_full = np.zeros((nVertices,))
-    zVertex_full = np.zeros((nVertices,))
+    xVertex_full = np.empty((nVertices,))
+    yVertex_full = np.empty((nVertices,))
+    zVertex_full = np.empty((nVertices,))
 
-    for iVertex in np.arange(0, nVertices):
+    for iVertex in range(nVertices):
         cell1 = cellsOnVertex_full[iVertex, 0]
         cell2 = cellsOnVertex_full[iVertex, 1]
         cell3 = cellsOnVertex_full[iVertex, 2]
@@ -98,8 +98,7 @@ def jigsaw_to_netcdf(msh_filename, output_name, on_sphere, sphere_radius=None):
     meshDensity_full = grid.createVariable(
         'meshDensity', 'f8', ('nCells',))
 
-    for iCell in np.arange(0, nCells):
-        meshDensity_full[iCell] = 1.0
+    meshDensity_full[:] = 1.0
 
     del meshDensity_full
 
@@ -7,15 +7,27 @@ defines the mesh.
 from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
+import collections
+import weakref
+
 import numpy as np
 
+from mpas_tools.mesh.creation.util import get_numba_kernels
+
+# transforms of recently used ``lat`` arrays, see _lat_transform()
+_latTransformCache = collections.OrderedDict()
+_latTransformCacheSize = 8
+
 
 def mergeCellWidthVsLat(
         lat,
         cellWidthInSouth,
         cellWidthInNorth,
         latTransition,
-        latWidthTransition):
+        latWidthTransition,
+        useNumba=False,
+        fastTanh=False,
+        dtype=None):
     """
     Combine two cell width distributions using a ``tanh`` function. This is
     intended as part of the workflow to make an MPAS global mesh.
@@ -38,33 +50,63 @@ def mergeCellWidthVsLat(
     latWidthTransition : float
         width of lat transition in degrees
 
+    useNumba : bool, optional
+        Whether to use a fused, parallel ``numba`` kernel (if ``numba`` is
+        installed).  Results may differ from the ``numpy`` version at
+        round-off level.
+
+    fastTanh : bool, optional
+        Whether the ``numba`` kernel should use a rational approximation of
+        ``tanh`` (accurate to about 1e-4) rather than the exact function.
+        Only used if ``useNumba=True`` and ``numba`` is installed.
+
+    dtype : numpy.dtype, optional
+        The floating-point type used for the computation and the result.  By
+        default, the type of ``lat`` (but at least ``float32``), so that
+        single-precision input is processed in single precision.
+
     Returns
     -------
     cellWidthOut : ndarray
         vector of length n, entries are cell width as a function of lat
     """
 
-    cellWidthOut = np.ones(lat.size)
+    lat, dtype = _as_float_array(lat, dtype)
+
+    kernels = get_numba_kernels() if useNumba else None
+    if kernels is not None:
+        # the kernels work on contiguous 1D arrays
+        cellWidthInSouth = np.broadcast_to(
+            cellWidthInSouth, lat.shape).astype(dtype).ravel()
+        cellWidthInNorth = np.broadcast_to(
+            cellWidthInNorth, lat.shape).astype(dtype).ravel()
+        cellWidthOut = kernels.merge_cell_width_vs_lat(
+            lat.ravel(), cellWidthInSouth, cellWidthInNorth,
+            float(latTransition), float(latWidthTransition), fastTanh)
+        return cellWidthOut.reshape(lat.shape)[()]
+
+    cellWidthInSouth = np.asarray(cellWidthInSouth, dtype=dtype)
+    cellWidthInNorth = np.asarray(cellWidthInNorth, dtype=dtype)
+    latTransition = dtype.type(latTransition)
+    latWidthTransition = dtype.type(latWidthTransition)
     if latWidthTransition == 0:
-        for j in range(lat.size):
-            if lat[j] < latTransition:
-                cellWidthOut[j] = cellWidthInSouth[j]
-            else:
-                cellWidthOut[j] = cellWidthInNorth[j]
+        cellWidthOut = np.where(lat < latTransition, cellWidthInSouth,
+                                cellWidthInNorth)[()]
     else:
-        for j in range(lat.size):
-            weightNorth = 0.5 * \
-                (np.tanh((lat[j] - latTransition) / latWidthTransition) + 1.0)
-            weightSouth = 1.0 - weightNorth
-            cellWidthOut[j] = weightSouth * cellWidthInSouth[j] + \
-                weightNorth * cellWidthInNorth[j]
+        weightNorth = 0.5 * \
+            (np.tanh((lat - latTransition) / latWidthTransition) + 1.0)
+        weightSouth = 1.0 - weightNorth
+        cellWidthOut = weightSouth * cellWidthInSouth + \
+            weightNorth * cellWidthInNorth
 
     return cellWidthOut
 
 
 def EC_CellWidthVsLat(lat, cellWidthEq=30.0, cellWidthMidLat=60.0,
                       cellWidthPole=35.0, latPosEq=15.0, latPosPole=73.0,
-                      latTransition=40.0, latWidthEq=6.0, latWidthPole=9.0):
+                      latTransition=40.0, latWidthEq=6.0, latWidthPole=9.0,
+                      useNumba=False, fastTanh=False, cacheLat=False,
+                      dtype=None):
     """
     Create Eddy Closure spacing as a function of lat. This is intended as part
     of the workflow to make an MPAS global mesh.
@@ -98,6 +140,26 @@ def EC_CellWidthVsLat(lat, cellWidthEq=30.0, cellWidthMidLat=60.0,
     latWidthPole : float, optional
        Width in degrees latitude of the polar transition region
 
+    useNumba : bool, optional
+       Whether to use a fused, parallel ``numba`` kernel (if ``numba`` is
+       installed).  Results may differ from the ``numpy`` version at
+       round-off level.
+
+    fastTanh : bool, optional
+       Whether the ``numba`` kernel should use a rational approximation of
+       ``tanh`` (accurate to about 1e-4) rather than the exact function.
+       Only used if ``useNumba=True`` and ``numba`` is installed.
+
+    cacheLat : bool, optional
+       Whether to cache transforms of ``lat`` (e.g. its absolute value) so
+       they can be reused by later calls with the same ``lat`` array, which
+       must not be modified in the meantime
+
+    dtype : numpy.dtype, optional
+       The floating-point type used for the computation and the result.  By
+       default, the type of ``lat`` (but at least ``float32``), so that
+       single-precision input is processed in single precision.
+
     Returns
     -------
     cellWidthOut : ndarray
@@ -115,23 +177,48 @@ def EC_CellWidthVsLat(lat, cellWidthEq=30.0, cellWidthMidLat=60.0,
     >>> EC120to60 = EC_CellWidthVsLat(lat, cellWidthEq=60., cellWidthMidLat=120., cellWidthPole=70.)
     """
 
+    lat, dtype = _as_float_array(lat, dtype)
+
     minCellWidth = min(cellWidthEq, min(cellWidthMidLat, cellWidthPole))
-    densityEq = (minCellWidth / cellWidthEq)**4
-    densityMidLat = (minCellWidth / cellWidthMidLat)**4
-    densityPole = (minCellWidth / cellWidthPole)**4
+    ratio = minCellWidth / cellWidthEq
+    densityEq = (ratio * ratio) * (ratio * ratio)
+    ratio = minCellWidth / cellWidthMidLat
+    densityMidLat = (ratio * ratio) * (ratio * ratio)
+    ratio = minCellWidth / cellWidthPole
+    densityPole = (ratio * ratio) * (ratio * ratio)
+
+    kernels = get_numba_kernels() if useNumba else None
+    if kernels is not None:
+        # the kernels work on contiguous 1D arrays
+        cellWidthOut = kernels.ec_cell_width_vs_lat(
+            lat.ravel(), float(minCellWidth), float(densityEq),
+            float(densityMidLat), float(densityPole), float(latPosEq),
+            float(latPosPole), float(latTransition), float(latWidthEq),
+            float(latWidthPole), fastTanh)
+        return cellWidthOut.reshape(lat.shape)[()]
+
+    # keep the scalars from promoting single-precision arrays
+    minCellWidth, densityEq, densityMidLat, densityPole, latPosEq, \
+        latPosPole, latTransition, latWidthEq, latWidthPole = \
+        [dtype.type(value) for value in
+         (minCellWidth, densityEq, densityMidLat, densityPole, latPosEq,
+          latPosPole, latTransition, latWidthEq, latWidthPole)]
+
+    absLat = _lat_transform(lat, 'abs', np.abs, cacheLat)
     densityEqToMid = ((densityEq - densityMidLat) * (1.0 + np.tanh(
-        (latPosEq - np.abs(lat)) / latWidthEq)) / 2.0) + densityMidLat
+        (latPosEq - absLat) / latWidthEq)) / 2.0) + densityMidLat
     densityMidToPole = ((densityMidLat - densityPole) * (1.0 + np.tanh(
-        (latPosPole - np.abs(lat)) / latWidthPole)) / 2.0) + densityPole
-    mask = np.abs(lat) < latTransition
-    densityEC = np.array(densityMidToPole)
-    densityEC[mask] = densityEqToMid[mask]
-    cellWidthOut = minCellWidth / densityEC**0.25
+        (latPosPole - absLat) / latWidthPole)) / 2.0) + densityPole
+    densityEC = np.where(absLat < latTransition, densityEqToMid,
+                         densityMidToPole)
+    # the 4th root as two square roots is much cheaper than a call to pow
+    cellWidthOut = minCellWidth / np.sqrt(np.sqrt(densityEC))
 
     return cellWidthOut
 
 
-def RRS_CellWidthVsLat(lat, cellWidthEq, cellWidthPole):
+def RRS_CellWidthVsLat(lat, cellWidthEq, cellWidthPole, useNumba=False,
+                       cacheLat=False, dtype=None):
     """
     Create Rossby Radius Scaling as a function of lat.  This is intended  as
     part of the workflow to make an MPAS global mesh.
@@ -147,6 +234,21 @@ def RRS_CellWidthVsLat(lat, cellWidthEq, cellWidthPole):
     cellWidthPole : float, optional
        Cell width in km at the poles
 
+    useNumba : bool, optional
+       Whether to use a fused, parallel ``numba`` kernel (if ``numba`` is
+       installed).  Results may differ from the ``numpy`` version at
+       round-off level.
+
+    cacheLat : bool, optional
+       Whether to cache transforms of ``lat`` (e.g. its absolute value) so
+       they can be reused by later calls with the same ``lat`` array, which
+       must not be modified in the meantime
+
+    dtype : numpy.dtype, optional
+       The floating-point type used for the computation and the result.  By
+       default, the type of ``lat`` (but at least ``float32``), so that
+       single-precision input is processed in single precision.
+
     Returns
     -------
     cellWidthOut : ndarray
@@ -158,12 +260,27 @@ def RRS_CellWidthVsLat(lat, cellWidthEq, cellWidthPole):
     >>> RRS18to6 = EC_CellWidthVsLat(lat, 18., 6.)
     """
 
+    lat, dtype = _as_float_array(lat, dtype)
+
     # ratio between high and low resolution
     gamma = (cellWidthPole / cellWidthEq)**4.0
 
-    densityRRS = (1.0 - gamma) * \
-        np.power(np.sin(np.deg2rad(np.absolute(lat))), 4.0) + gamma
-    cellWidthOut = cellWidthPole / np.power(densityRRS, 0.25)
+    kernels = get_numba_kernels() if useNumba else None
+    if kernels is not None:
+        # the kernels work on contiguous 1D arrays
+        cellWidthOut = kernels.rrs_cell_width_vs_lat(
+            lat.ravel(), float(cellWidthPole), float(gamma))
+        return cellWidthOut.reshape(lat.shape)[()]
+
+    cellWidthPole = dtype.type(cellWidthPole)
+    gamma = dtype.type(gamma)
+
+    absLat = _lat_transform(lat, 'abs', np.abs, cacheLat)
+    sinLat = _lat_transform(lat, 'sinAbs',
+                            lambda _: np.sin(np.deg2rad(absLat)), cacheLat)
+    sinLat2 = sinLat * sinLat
+    densityRRS = (1.0 - gamma) * (sinLat2 * sinLat2) + gamma
+    cellWidthOut = cellWidthPole / np.sqrt(np.sqrt(densityRRS))
     return cellWidthOut
 
 
@@ -191,22 +308,61 @@ def AtlanticPacificGrid(lat, lon, cellWidthInAtlantic, cellWidthInPacific):
          m by n array, grid cell width on globe, km
 
     """
-    cellWidthOut = np.zeros((lat.size, lon.size))
-    for i in range(lon.size):
-        for j in range(lat.size):
-            # set to Pacific mask as default
-            cellWidthOut[j, i] = cellWidthInPacific[j]
-            # test if in Atlantic Basin:
-            if lat[j] > 65.0:
-                if (lon[i] > -150.0) & (lon[i] < 170.0):
-                    cellWidthOut[j, i] = cellWidthInAtlantic[j]
-            elif lat[j] > 20.0:
-                if (lon[i] > -100.0) & (lon[i] < 35.0):
-                    cellWidthOut[j, i] = cellWidthInAtlantic[j]
-            elif lat[j] > 0.0:
-                if (lon[i] > -2.0 * lat[j] - 60.0) & (lon[i] < 35.0):
-                    cellWidthOut[j, i] = cellWidthInAtlantic[j]
-            else:
-                if (lon[i] > -60.0) & (lon[i] < 20.0):
-                    cellWidthOut[j, i] = cellWidthInAtlantic[j]
+    latc = lat[:, np.newaxis]
+    lonc = lon[np.newaxis, :]
+    # test if in Atlantic Basin, Pacific otherwise
+    atlantic = (latc > 65.0) & (lonc > -150.0) & (lonc < 170.0)
+    atlantic |= (latc <= 65.0) & (latc > 20.0) & \
+        (lonc > -100.0) & (lonc < 35.0)
+    atlantic |= (latc <= 20.0) & (latc > 0.0) & \
+        (lonc > -2.0 * latc - 60.0) & (lonc < 35.0)
+    atlantic |= (latc <= 0.0) & (lonc > -60.0) & (lonc < 20.0)
+    cellWidthOut = np.where(
+        atlantic,
+        np.asarray(cellWidthInAtlantic, dtype=float)[:, np.newaxis],
+        np.asarray(cellWidthInPacific, dtype=float)[:, np.newaxis])
     return cellWidthOut
+
+
+def _as_float_array(lat, dtype):
+    """
+    Convert ``lat`` to an array of the given floating-point type or, if
+    ``dtype`` is ``None``, of its own type promoted to at least ``float32``
+    """
+    lat = np.asarray(lat)
+    if dtype is None:
+        dtype = np.result_type(lat, np.float32)
+    dtype = np.dtype(dtype)
+    return np.asarray(lat, dtype=dtype), dtype
+
+
+def _lat_transform(lat, name, func, cacheLat):
+    """
+    Compute ``func(lat)``, reusing the result from an earlier call with the
+    same ``lat`` array if ``cacheLat`` is ``True``
+    """
+    if not cacheLat or not isinstance(lat, np.ndarray):
+        return func(lat)
+
+    key = (id(lat), lat.shape, lat.dtype.str, name)
+    if key in _latTransformCache:
+        latRef, value = _latTransformCache[key]
+        # make sure the id hasn't been reused by a different array
+        if latRef() is lat:
+            _latTransformCache.move_to_end(key)
+            return value
+
+    value = func(lat)
+    # the same array may be handed to later callers, so protect it
+    value.setflags(write=False)
+
+    def _discard(latRef):
+        # drop the entry as soon as ``lat`` is garbage collected
+        entry = _latTransformCache.get(key)
+        if entry is not None and entry[0] is latRef:
+            del _latTransformCache[key]
+
+    _latTransformCache[key] = (weakref.ref(lat, _discard), value)
+    while len(_latTransformCache) > _latTransformCacheSize:
+        _latTransformCache.popitem(last=False)
+    return value
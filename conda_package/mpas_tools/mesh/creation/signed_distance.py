@@ -200,7 +200,7 @@ def distance_from_geojson(fc, lon_grd, lat_grd, earth_radius, nn_search='flann',
 
     # Convert coastline points to x,y,z and create kd-tree
     npoints = len(boundary_lon)
-    boundary_xyz = np.zeros((npoints, 3))
+    boundary_xyz = np.empty((npoints, 3))
     boundary_xyz[:, 0], boundary_xyz[:, 1], boundary_xyz[:, 2] = \
         lonlat2xyz(boundary_lon, boundary_lat, earth_radius)
     flann = None
@@ -4,12 +4,13 @@ from __future__ import absolute_import, division, print_function, \
 import numpy as np
 
 from netCDF4 import Dataset as NetCDFFile
-from mpas_tools.mesh.creation.util import circumcenter
+from mpas_tools.mesh.creation.util import circumcenter_planar_batch
 
 import argparse
 
 
-def triangle_to_netcdf(node, ele, output_name):
+def triangle_to_netcdf(node, ele, output_name, format='NETCDF4',
+                       use_numba=False):
     """
     Converts mesh data defined in triangle format to NetCDF
 
@@ -21,30 +22,28 @@ def triangle_to_netcdf(node, ele, output_name):
         An element file name
     output_name: str
         The name of the output file
+    format : {'NETCDF4', 'NETCDF4_CLASSIC', 'NETCDF3_64BIT',
+              'NETCDF3_CLASSIC'}, optional
+        The NetCDF file format to use.  With the NETCDF4 formats, variables
+        are chunked and compressed.
+    use_numba : bool, optional
+        Whether to compute the circumcenters with a parallel ``numba`` kernel
+        (if ``numba`` is installed)
     """
     # Authors: Phillip J. Wolfram, Matthew Hoffman and Xylar Asay-Davis
-    on_sphere = False
-    grid = NetCDFFile(output_name, 'w', format='NETCDF3_CLASSIC')
+    grid = NetCDFFile(output_name, 'w', format=format)
 
     # Get dimensions
-    # Get nCells
-    cell_info = open(node, 'r')
-    nCells = -1  # There is one header line
-    for block in iter(lambda: cell_info.readline(), ""):
-        if block.startswith("#"):
-            continue  # skip comment lines
-        nCells = nCells + 1
-    cell_info.close()
+    # Get nCells, skipping the first column, which is the node number
+    xy = _read_triangle_file(node, usecols=(1, 2), dtype=np.float64)
+    nCells = xy.shape[0]
 
     # Get vertexDegree and nVertices
-    cov_info = open(ele, 'r')
     vertexDegree = 3  # always triangles with Triangle!
-    nVertices = -1  # There is one header line
-    for block in iter(lambda: cov_info.readline(), ""):
-        if block.startswith("#"):
-            continue  # skip comment lines
-        nVertices = nVertices + 1
-    cov_info.close()
+    # skip the first column, which is the triangle number, and then only get
+    # the next 3 columns
+    cov = _read_triangle_file(ele, usecols=(1, 2, 3), dtype=np.int32)
+    nVertices = cov.shape[0]
 
     if vertexDegree != 3:
         ValueError("This script can only compute vertices with triangular "
@@ -54,97 +53,86 @@ def triangle_to_netcdf(node, ele, output_name):
     grid.createDimension('nVertices', nVertices)
     grid.createDimension('vertexDegree', vertexDegree)
 
-    # Create cell variables and sphere_radius
-    xCell_full = np.zeros((nCells,))
-    yCell_full = np.zeros((nCells,))
-    zCell_full = np.zeros((nCells,))
-
-    cell_info = open(node, 'r')
-    cell_info.readline()  # read header
-    i = 0
-    for block in iter(lambda: cell_info.readline(), ""):
-        block_arr = block.split()
-        if block_arr[0] == "#":
-            continue  # skip comment lines
-        xCell_full[i] = float(block_arr[1])
-        yCell_full[i] = float(block_arr[2])
-        zCell_full[i] = 0.0  # z-position is always 0.0 in a planar mesh
-        i = i + 1
-    cell_info.close()
-
     grid.on_a_sphere = "NO"
     grid.sphere_radius = 0.0
 
-    cellsOnVertex_full = np.zeros(
-        (nVertices, vertexDegree), dtype=np.int32)
-
-    cov_info = open(ele, 'r')
-    cov_info.readline()  # read header
-    iVertex = 0
-    for block in iter(lambda: cov_info.readline(), ""):
-        block_arr = block.split()
-        if block_arr[0] == "#":
-            continue  # skip comment lines
-        cellsOnVertex_full[iVertex, :] = int(-1)
-        # skip the first column, which is the triangle number, and then
-        # only get the next 3 columns
-        for j in np.arange(0, 3):
-            cellsOnVertex_full[iVertex, j] = int(block_arr[j + 1])
-
-        iVertex = iVertex + 1
-
-    cov_info.close()
-
-    # Create vertex variables
-    xVertex_full = np.zeros((nVertices,))
-    yVertex_full = np.zeros((nVertices,))
-    zVertex_full = np.zeros((nVertices,))
-
-    for iVertex in np.arange(0, nVertices):
-        cell1 = cellsOnVertex_full[iVertex, 0]
-        cell2 = cellsOnVertex_full[iVertex, 1]
-        cell3 = cellsOnVertex_full[iVertex, 2]
-
-        x1 = xCell_full[cell1 - 1]
-        y1 = yCell_full[cell1 - 1]
-        z1 = zCell_full[cell1 - 1]
-        x2 = xCell_full[cell2 - 1]
-        y2 = yCell_full[cell2 - 1]
-        z2 = zCell_full[cell2 - 1]
-        x3 = xCell_full[cell3 - 1]
-        y3 = yCell_full[cell3 - 1]
-        z3 = zCell_full[cell3 - 1]
-
-        pv = circumcenter(on_sphere, x1, y1, z1, x2, y2, z2, x3, y3, z3)
-        xVertex_full[iVertex] = pv.x
-        yVertex_full[iVertex] = pv.y
-        zVertex_full[iVertex] = pv.z
-
-    meshDensity_full = grid.createVariable(
-        'meshDensity', 'f8', ('nCells',))
-
-    meshDensity_full[0:nCells] = 1.0
-
-    var = grid.createVariable('xCell', 'f8', ('nCells',))
-    var[:] = xCell_full
-    var = grid.createVariable('yCell', 'f8', ('nCells',))
-    var[:] = yCell_full
-    var = grid.createVariable('zCell', 'f8', ('nCells',))
-    var[:] = zCell_full
-    var = grid.createVariable('xVertex', 'f8', ('nVertices',))
-    var[:] = xVertex_full
-    var = grid.createVariable('yVertex', 'f8', ('nVertices',))
-    var[:] = yVertex_full
-    var = grid.createVariable('zVertex', 'f8', ('nVertices',))
-    var[:] = zVertex_full
-    var = grid.createVariable(
-        'cellsOnVertex', 'i4', ('nVertices', 'vertexDegree',))
-    var[:] = cellsOnVertex_full
+    # Create all variables up front so each field can be written as soon as
+    # it is available, without keeping full copies around
+    meshDensity = _create_variable(grid, 'meshDensity', 'f8', ('nCells',))
+    xCell = _create_variable(grid, 'xCell', 'f8', ('nCells',))
+    yCell = _create_variable(grid, 'yCell', 'f8', ('nCells',))
+    zCell = _create_variable(grid, 'zCell', 'f8', ('nCells',))
+    xVertex = _create_variable(grid, 'xVertex', 'f8', ('nVertices',))
+    yVertex = _create_variable(grid, 'yVertex', 'f8', ('nVertices',))
+    zVertex = _create_variable(grid, 'zVertex', 'f8', ('nVertices',))
+    cellsOnVertex = _create_variable(
+        grid, 'cellsOnVertex', 'i4', ('nVertices', 'vertexDegree',))
+
+    meshDensity[:] = 1.0
+
+    # Write cell variables; z-position is always 0.0 in a planar mesh
+    xCell[:] = xy[:, 0]
+    yCell[:] = xy[:, 1]
+    zCell[:] = 0.0
+
+    cellsOnVertex[:] = cov
+
+    # Write vertex variables at the circumcenters of the triangles
+    cells = cov - 1
+    del cov
+    x1 = xy[cells[:, 0], 0]
+    y1 = xy[cells[:, 0], 1]
+    x2 = xy[cells[:, 1], 0]
+    y2 = xy[cells[:, 1], 1]
+    x3 = xy[cells[:, 2], 0]
+    y3 = xy[cells[:, 2], 1]
+    del xy, cells
+
+    xVertex[:], yVertex[:] = circumcenter_planar_batch(
+        x1, y1, x2, y2, x3, y3, use_numba=use_numba)
+    zVertex[:] = 0.0
 
     grid.sync()
     grid.close()
 
 
+def _create_variable(grid, name, datatype, dimensions):
+    """
+    Create a variable, chunked and compressed if the file format supports it
+    """
+    kwargs = {}
+    if grid.data_model.startswith('NETCDF4'):
+        # chunk along the first dimension, keeping any others whole
+        chunksizes = [len(grid.dimensions[dim]) for dim in dimensions]
+        chunksizes[0] = min(chunksizes[0], 65536)
+        kwargs = dict(zlib=True, complevel=1, shuffle=True,
+                      chunksizes=[max(size, 1) for size in chunksizes])
+    return grid.createVariable(name, datatype, dimensions, **kwargs)
+
+
+def _read_triangle_file(filename, usecols, dtype):
+    """
+    Read the given columns of the records in a Triangle .node or .ele file in
+    a single pass, skipping any comments.  The first entry of the header line
+    is the number of records, which is used to check the file is complete.
+    """
+    with open(filename, 'r') as f:
+        # skip blank and comment lines before the header, then the header
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                break
+        else:
+            raise ValueError('no header line in {}'.format(filename))
+        count = int(line.split()[0])
+        data = np.loadtxt(f, comments='#', usecols=usecols, dtype=dtype,
+                          ndmin=2)
+    if data.shape[0] != count:
+        raise ValueError('Expected {} records in {} but found {}'.format(
+            count, filename, data.shape[0]))
+    return data
+
+
 def main():
     parser = argparse.ArgumentParser(
         description=__doc__,
@@ -170,6 +158,15 @@ def main():
         default="grid.nc",
         help="output file name.",
         metavar="FILE")
+    parser.add_argument(
+        "-f",
+        "--format",
+        dest="format",
+        default="NETCDF4",
+        choices=["NETCDF4", "NETCDF4_CLASSIC", "NETCDF3_64BIT",
+                 "NETCDF3_CLASSIC"],
+        help="output NetCDF file format.")
     options = parser.parse_args()
 
-    triangle_to_netcdf(options.node, options.ele, options.output)
+    triangle_to_netcdf(options.node, options.ele, options.output,
+                       format=options.format)
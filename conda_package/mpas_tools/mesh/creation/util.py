@@ -3,6 +3,8 @@ import numpy as np
 
 point = collections.namedtuple('Point', ['x', 'y', 'z'])
 
+_numbaKernels = None
+
 
 def circumcenter(on_sphere, x1, y1, z1, x2, y2, z2, x3, y3, z3):
     """
@@ -48,6 +50,45 @@ def circumcenter(on_sphere, x1, y1, z1, x2, y2, z2, x3, y3, z3):
     return point(xv, yv, zv)
 
 
+def circumcenter_planar_batch(x1, y1, x2, y2, x3, y3, use_numba=False):
+    """
+    Compute the circumcenters of many planar triangles at once
+
+    Parameters
+    ----------
+    x1, y1, x2, y2, x3, y3 : numpy.ndarray
+        The Cartesian coordinates of the three vertices of each triangle
+
+    use_numba : bool, optional
+        Whether to use a parallel ``numba`` kernel (if ``numba`` is
+        installed).  Results may differ from the ``numpy`` version at
+        round-off level.
+
+    Returns
+    -------
+    xv, yv : numpy.ndarray
+        The coordinates of the circumcenters of the triangles
+    """
+    # contiguous float64 buffers so the arithmetic below is not strided
+    x1, y1, x2, y2, x3, y3 = [np.ascontiguousarray(coord, dtype=np.float64)
+                              for coord in (x1, y1, x2, y2, x3, y3)]
+
+    kernels = get_numba_kernels() if use_numba else None
+    if kernels is not None:
+        return kernels.circumcenter_planar(x1, y1, x2, y2, x3, y3)
+
+    d = 2 * (x1 * (y2 - y3) + x2 * (y3 - y1) + x3 * (y1 - y2))
+
+    r1 = x1**2 + y1**2
+    r2 = x2**2 + y2**2
+    r3 = x3**2 + y3**2
+
+    xv = (r1 * (y2 - y3) + r2 * (y3 - y1) + r3 * (y1 - y2)) / d
+    yv = (r1 * (x3 - x2) + r2 * (x1 - x3) + r3 * (x2 - x1)) / d
+
+    return xv, yv
+
+
 def lonlat2xyz(lon, lat, R=6378206.4):
     """
     Convert from longitude and latitude to Cartesian coordinates
@@ -74,3 +115,26 @@ def lonlat2xyz(lon, lat, R=6378206.4):
     z = R*np.sin(lat)
 
     return x, y, z
+
+
+def get_numba_kernels():
+    """
+    Get the module of optional ``numba`` kernels, importing (and so compiling)
+    them on first use
+
+    Returns
+    -------
+    kernels : module or None
+        The ``mpas_tools.mesh.creation._numba_kernels`` module, or ``None`` if
+        ``numba`` is not installed
+    """
+    global _numbaKernels
+    if _numbaKernels is None:
+        try:
+            from mpas_tools.mesh.creation import _numba_kernels
+            _numbaKernels = _numba_kernels
+        except ImportError:
+            _numbaKernels = False
+    if _numbaKernels is False:
+        return None
+    return _numbaKernels
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+
+import gc
+
+import numpy
+import pytest
+
+from mpas_tools.mesh.creation import mesh_definition_tools
+from mpas_tools.mesh.creation.mesh_definition_tools import \
+    mergeCellWidthVsLat, EC_CellWidthVsLat, RRS_CellWidthVsLat, \
+    AtlanticPacificGrid
+
+
+def _cell_width_functions():
+    """
+    Functions of lat (and extra keyword arguments) covering each of the
+    cell-width functions and both branches of ``mergeCellWidthVsLat()``
+    """
+    return [
+        lambda lat, **kwargs: EC_CellWidthVsLat(lat, **kwargs),
+        lambda lat, **kwargs: RRS_CellWidthVsLat(lat, 18., 6., **kwargs),
+        lambda lat, **kwargs: mergeCellWidthVsLat(
+            lat, 30., 10., 20., 5., **kwargs),
+        lambda lat, **kwargs: mergeCellWidthVsLat(
+            lat, 30., 10., 20., 0., **kwargs)]
+
+
+def test_numba_matches_numpy():
+    pytest.importorskip('numba')
+
+    lat1D = numpy.linspace(-90., 90., 721)
+    lat2D = numpy.linspace(-90., 90., 6003).reshape(2001, 3)
+    for func in _cell_width_functions():
+        for lat in [lat1D, lat2D, lat2D.T, 10.]:
+            expected = func(lat)
+            cellWidth = func(lat, useNumba=True)
+            assert numpy.shape(cellWidth) == numpy.shape(expected)
+            assert numpy.allclose(cellWidth, expected, rtol=1e-10)
+
+    # the approximate tanh is accurate to about 1e-4
+    expected = EC_CellWidthVsLat(lat1D)
+    cellWidth = EC_CellWidthVsLat(lat1D, useNumba=True, fastTanh=True)
+    assert numpy.allclose(cellWidth, expected, rtol=1e-3)
+    expected = mergeCellWidthVsLat(lat1D, 30., 10., 20., 5.)
+    cellWidth = mergeCellWidthVsLat(lat1D, 30., 10., 20., 5., useNumba=True,
+                                    fastTanh=True)
+    assert numpy.allclose(cellWidth, expected, rtol=1e-3)
+
+
+def test_dtype_and_scalar():
+    lat = numpy.linspace(-90., 90., 721)
+    for func in _cell_width_functions():
+        # single-precision input stays in single precision
+        cellWidth = func(lat.astype(numpy.float32))
+        assert cellWidth.dtype == numpy.float32
+        assert numpy.allclose(cellWidth, func(lat), rtol=1e-5)
+
+        assert func(lat).dtype == numpy.float64
+        assert func(numpy.arange(-90, 91)).dtype == numpy.float64
+        assert func(lat.astype(numpy.float32),
+                    dtype=numpy.float64).dtype == numpy.float64
+
+        # scalar input gives scalar output
+        cellWidth = func(10.)
+        assert numpy.ndim(cellWidth) == 0
+        assert not isinstance(cellWidth, numpy.ndarray)
+
+
+def test_lat_cache():
+    cache = mesh_definition_tools._latTransformCache
+    cache.clear()
+
+    lat = numpy.linspace(-90., 90., 721)
+    expectedEC = EC_CellWidthVsLat(lat)
+    expectedRRS = RRS_CellWidthVsLat(lat, 18., 6.)
+    assert len(cache) == 0
+
+    # results with the cache match those without
+    assert numpy.all(EC_CellWidthVsLat(lat, cacheLat=True) == expectedEC)
+    assert len(cache) == 1
+    (absLat,) = [value for key, (_, value) in cache.items()
+                 if key[-1] == 'abs']
+
+    # RRS on the same lat reuses abs and adds sin(abs)
+    assert numpy.all(RRS_CellWidthVsLat(lat, 18., 6., cacheLat=True) ==
+                     expectedRRS)
+    assert len(cache) == 2
+    assert [value for key, (_, value) in cache.items()
+            if key[-1] == 'abs'] == [absLat]
+
+    # a cache hit returns the cached array
+    assert mesh_definition_tools._lat_transform(
+        lat, 'abs', numpy.abs, True) is absLat
+    assert numpy.all(EC_CellWidthVsLat(lat, cacheLat=True) == expectedEC)
+    assert len(cache) == 2
+
+    # cached values are read-only
+    for _, value in cache.values():
+        assert not value.flags.writeable
+
+    # entries go away when lat is garbage collected
+    del lat, absLat
+    gc.collect()
+    assert len(cache) == 0
+
+    # the cache never grows past its maximum size
+    lats = [numpy.linspace(-90., 90., 10 + index) for index in range(
+        mesh_definition_tools._latTransformCacheSize)]
+    for lat in lats:
+        RRS_CellWidthVsLat(lat, 18., 6., cacheLat=True)
+        assert len(cache) <= mesh_definition_tools._latTransformCacheSize
+    assert len(cache) == mesh_definition_tools._latTransformCacheSize
+    del lat, lats
+    gc.collect()
+    assert len(cache) == 0
+
+
+def test_atlantic_pacific_grid():
+    # include the band boundaries at 65, 20 and 0 degrees and the longitude
+    # bounds, with fewer longitudes than latitudes
+    lat = numpy.array([-90., -10., 0., 0.5, 10., 20., 20.5, 40., 65., 65.5,
+                       80., 90.])
+    lon = numpy.array([-180., -150., -100., -80., -60., -2., 20., 35., 100.,
+                       170.])
+    # integer widths still give a floating-point grid
+    cellWidthInAtlantic = numpy.arange(lat.size) + 1
+    cellWidthInPacific = 100 * (numpy.arange(lat.size) + 1)
+
+    cellWidth = AtlanticPacificGrid(lat, lon, cellWidthInAtlantic,
+                                    cellWidthInPacific)
+    assert cellWidth.shape == (lat.size, lon.size)
+    assert cellWidth.dtype == numpy.float64
+
+    # the band rules, one point at a time
+    for j in range(lat.size):
+        for i in range(lon.size):
+            if lat[j] > 65.0:
+                atlantic = -150.0 < lon[i] < 170.0
+            elif lat[j] > 20.0:
+                atlantic = -100.0 < lon[i] < 35.0
+            elif lat[j] > 0.0:
+                atlantic = -2.0 * lat[j] - 60.0 < lon[i] < 35.0
+            else:
+                atlantic = -60.0 < lon[i] < 20.0
+            if atlantic:
+                expected = cellWidthInAtlantic[j]
+            else:
+                expected = cellWidthInPacific[j]
+            assert cellWidth[j, i] == expected
+
+
+if __name__ == '__main__':
+    test_numba_matches_numpy()
+    test_dtype_and_scalar()
+    test_lat_cache()
+    test_atlantic_pacific_grid()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+
+import os
+
+import numpy
+import pytest
+from netCDF4 import Dataset
+
+from mpas_tools.mesh.creation.triangle_to_netcdf import triangle_to_netcdf
+from mpas_tools.mesh.creation.util import circumcenter, \
+    circumcenter_planar_batch
+
+node = """# a unit square
+4 2 0 1
+1 0.0 0.0 1
+2 1.0 0.0 1
+#foo
+3 1.0 1.0 1
+4 0.0 1.0 1  # trailing comment
+# Generated by triangle
+"""
+
+ele = """2 3 0
+1 1 2 4
+#foo
+2 2 3 4
+# Generated by triangle
+"""
+
+
+def _write(path, text):
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def _use_numba_values():
+    """ Test the numba fast path too if numba is installed """
+    try:
+        import numba  # noqa: F401
+        return [False, True]
+    except ImportError:
+        return [False]
+
+
+def test_triangle_to_netcdf(tmp_path):
+    nodeFileName = os.path.join(str(tmp_path), 'mesh.node')
+    eleFileName = os.path.join(str(tmp_path), 'mesh.ele')
+    _write(nodeFileName, node)
+    _write(eleFileName, ele)
+
+    for format in ['NETCDF4', 'NETCDF3_CLASSIC']:
+        for use_numba in _use_numba_values():
+            outFileName = os.path.join(str(tmp_path), 'grid.nc')
+            triangle_to_netcdf(nodeFileName, eleFileName, outFileName,
+                               format=format, use_numba=use_numba)
+            _check_grid(outFileName, format)
+
+
+def _check_grid(outFileName, format):
+    with Dataset(outFileName) as grid:
+        assert grid.file_format == format
+        assert len(grid.dimensions['nCells']) == 4
+        assert len(grid.dimensions['nVertices']) == 2
+        assert numpy.all(grid.variables['xCell'][:] == [0., 1., 1., 0.])
+        assert numpy.all(grid.variables['yCell'][:] == [0., 0., 1., 1.])
+        assert numpy.all(grid.variables['zCell'][:] == 0.)
+        assert numpy.all(grid.variables['cellsOnVertex'][:] ==
+                         [[1, 2, 4], [2, 3, 4]])
+        # both triangles have their circumcenter at the square's center
+        assert numpy.allclose(grid.variables['xVertex'][:], 0.5)
+        assert numpy.allclose(grid.variables['yVertex'][:], 0.5)
+        assert numpy.all(grid.variables['zVertex'][:] == 0.)
+        assert numpy.all(grid.variables['meshDensity'][:] == 1.)
+
+
+def test_circumcenter_planar_batch():
+    rng = numpy.random.RandomState(0)
+    x1, y1, x2, y2, x3, y3 = rng.uniform(-1., 1., size=(6, 1000))
+
+    expectedX = numpy.zeros(x1.size)
+    expectedY = numpy.zeros(x1.size)
+    for index in range(x1.size):
+        center = circumcenter(False, x1[index], y1[index], 0.,
+                              x2[index], y2[index], 0.,
+                              x3[index], y3[index], 0.)
+        expectedX[index] = center.x
+        expectedY[index] = center.y
+
+    for use_numba in _use_numba_values():
+        xv, yv = circumcenter_planar_batch(x1, y1, x2, y2, x3, y3,
+                                           use_numba=use_numba)
+        # random triangles can be nearly degenerate, so compare relative to
+        # the size of the circumcenter
+        scale = numpy.maximum(1., numpy.abs(expectedX) + numpy.abs(expectedY))
+        assert numpy.all(numpy.abs(xv - expectedX) <= 1e-12 * scale)
+        assert numpy.all(numpy.abs(yv - expectedY) <= 1e-12 * scale)
+
+
+def test_triangle_to_netcdf_truncated(tmp_path):
+    nodeFileName = os.path.join(str(tmp_path), 'mesh.node')
+    eleFileName = os.path.join(str(tmp_path), 'mesh.ele')
+    outFileName = os.path.join(str(tmp_path), 'grid.nc')
+    _write(nodeFileName, node)
+    # drop the last triangle
+    _write(eleFileName, '\n'.join(ele.split('\n')[0:3]))
+
+    with pytest.raises(ValueError, match='Expected 2 records'):
+        triangle_to_netcdf(nodeFileName, eleFileName, outFileName)
+
+    _write(eleFileName, '# no header\n')
+    with pytest.raises(ValueError, match='no header line'):
+        triangle_to_netcdf(nodeFileName, eleFileName, outFileName)